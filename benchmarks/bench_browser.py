@@ -0,0 +1,59 @@
+"""
+Tiempo hasta la primera tabla: perfil vacío vs perfil persistente caliente.
+
+    python benchmarks/bench_browser.py [--regione LAZIO --provincia ROMA] [--runs 3]
+
+Cada medición es un proceso Playwright nuevo (como una ejecución real):
+  - efimero: p.chromium.launch() sin perfil
+  - perfil frio: launch_persistent_context sobre un directorio recién creado
+  - perfil caliente: mismo directorio reutilizado (caché de disco ya llena)
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from farmacias.navegador import open_page  # noqa: E402
+from farmacias.scraper import open_search  # noqa: E402
+
+
+def time_to_first_table(regione: str, provincia: str, profile_dir: str | None) -> float:
+    t0 = time.perf_counter()
+    with open_page(headless=True, profile_dir=profile_dir) as page:
+        open_search(page, regione, provincia)
+        elapsed = time.perf_counter() - t0
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--regione", default="LAZIO")
+    parser.add_argument("--provincia", default="ROMA")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results: dict[str, list[float]] = {"efimero": [], "perfil frio": [], "perfil caliente": []}
+
+    for _ in range(args.runs):
+        results["efimero"].append(time_to_first_table(args.regione, args.provincia, None))
+
+        profile = tempfile.mkdtemp(prefix="bench_profile_")
+        try:
+            results["perfil frio"].append(time_to_first_table(args.regione, args.provincia, profile))
+            results["perfil caliente"].append(time_to_first_table(args.regione, args.provincia, profile))
+        finally:
+            shutil.rmtree(profile, ignore_errors=True)
+
+    for name, samples in results.items():
+        print(f"{name:<16} mediana {statistics.median(samples):6.2f} s  (n={len(samples)})")
+
+
+if __name__ == "__main__":
+    main()
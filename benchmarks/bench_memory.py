@@ -0,0 +1,152 @@
+"""
+Memoria pico de un crawl grande: list[dict] vs list[list] vs RowStore.
+
+    python benchmarks/bench_memory.py [--rows 200000]
+
+Dos medidas:
+  - acumulación: pico de tracemalloc solo guardando las filas;
+  - extremo a extremo: filas + DataFrame final (rows_to_dataframe), como RSS
+    máximo de un proceso nuevo por caso (las columnas str de pandas viven en
+    Arrow, fuera de tracemalloc).
+
+Las filas se generan a partir de los CSV del repo, creando str nuevos por
+fila (como llegan de page.evaluate), para no falsear el reparto de strings.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from farmacias.core import COLS, DEDUP_KEYS, clean, require_pandas  # noqa: E402
+from farmacias.filas import RowStore  # noqa: E402
+
+
+def source_rows() -> list[list[str]]:
+    rows = []
+    for path in sorted(ROOT.glob("farmacie_*_provincia.csv")):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows.extend([r[c] for c in COLS] for r in csv.DictReader(f))
+    return rows
+
+
+def _fresh(s: str) -> str:
+    # objeto str nuevo (s + "" devolvería el mismo)
+    return (s + "\x00")[:-1]
+
+
+def fresh_rows(base: list[list[str]], n: int):
+    # cada fila con str nuevos y claves únicas (nada se deduplica)
+    for i in range(n):
+        r = base[i % len(base)]
+        yield [_fresh(v) for v in r[:6]] + [f"F/{i}", f"{i:011d}"]
+
+
+def measure(build, rows_iter) -> int:
+    gc.collect()
+    tracemalloc.start()
+    obj = build(rows_iter)
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return peak
+
+
+def build_dicts(rows):
+    return [dict(zip(COLS, r)) for r in rows]
+
+
+def build_lists(rows):
+    return list(rows)
+
+
+def build_store(rows):
+    return RowStore(rows)
+
+
+def dataframe_lists(rows):
+    # camino anterior de rows_to_dataframe: list[list] → DataFrame → clean → drop_duplicates
+    pd = require_pandas()
+    all_rows = list(rows)
+    df = pd.DataFrame(all_rows, columns=COLS)
+    for c in COLS:
+        df[c] = df[c].astype(str).map(clean)
+    return all_rows, df.drop_duplicates(subset=DEDUP_KEYS, keep="first").reset_index(drop=True)
+
+
+def dataframe_store(rows):
+    store = RowStore(rows)
+    return store, store.to_dataframe()
+
+
+END_TO_END = {"list[list]+df": dataframe_lists, "RowStore+df": dataframe_store}
+# intérprete + pandas/pyarrow + CSV de origen, sin generar filas
+BASELINE = "base"
+
+
+def rss_case(name: str, n_rows: int) -> None:
+    # proceso hijo: importa pandas (y pyarrow) antes de medir para que la base sea la misma
+    require_pandas()
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        pass
+    base = source_rows()
+    if name != BASELINE:
+        _obj = END_TO_END[name](fresh_rows(base, n_rows))
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)  # KiB en Linux
+
+
+def measure_rss(name: str, n_rows: int) -> int:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    out = subprocess.run(
+        [sys.executable, __file__, "--rows", str(n_rows), "--rss-case", name],
+        check=True, env=env, capture_output=True, text=True,
+    ).stdout
+    return int(out.split()[-1]) * 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--rss-case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.rss_case:
+        rss_case(args.rss_case, args.rows)
+        return
+
+    # antes de crecer: el hijo hereda el ru_maxrss del padre en el fork
+    rss = {name: measure_rss(name, args.rows) for name in END_TO_END}
+    rss_base = measure_rss(BASELINE, args.rows)
+
+    base = source_rows()
+    cases = {"list[dict]": build_dicts, "list[list]": build_lists, "RowStore": build_store}
+    peaks = {name: measure(fn, fresh_rows(base, args.rows)) for name, fn in cases.items()}
+
+    print("Acumulación (tracemalloc):")
+    ref = peaks["list[dict]"]
+    for name, peak in peaks.items():
+        print(f"  {name:<14} pico {peak / 2**20:8.1f} MiB  ({ref / peak:4.1f}x vs list[dict])")
+
+    print(f"Extremo a extremo, filas + DataFrame (RSS máximo; base {rss_base / 2**20:.1f} MiB):")
+    ref = rss["list[list]+df"]
+    for name, peak in rss.items():
+        extra = peak - rss_base
+        print(
+            f"  {name:<14} pico {peak / 2**20:8.1f} MiB  ({ref / peak:4.1f}x vs list[list]+df)"
+            f"  sobre la base {extra / 2**20:8.1f} MiB  ({(ref - rss_base) / extra:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Mide el arranque en frío de trabajos pequeños (proceso nuevo cada vez).
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+INPUT_FILE = ROOT / "farmacie_lombardia_milano_provincia.csv"
+
+
+def time_cmd(code: str, runs: int) -> float:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env, cwd=ROOT)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    out = Path(tempfile.gettempdir()) / "bench_startup_maps.csv"
+
+    cases = {
+        "import farmacias": "import farmacias.scraper, farmacias.limpieza",
+        "import pandas + playwright (antes)": "import pandas, playwright.sync_api",
+        "direccion (csv)": (
+            "from farmacias.limpieza import add_direccion_completa;"
+            f"add_direccion_completa({str(INPUT_FILE)!r}, {str(out)!r})"
+        ),
+        "direccion (pandas)": (
+            "from farmacias.limpieza import add_direccion_completa;"
+            f"add_direccion_completa({str(INPUT_FILE)!r}, {str(out)!r}, use_pandas=True)"
+        ),
+    }
+
+    for name, code in cases.items():
+        print(f"{name:<40} {time_cmd(code, args.runs) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
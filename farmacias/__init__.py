@@ -0,0 +1,11 @@
+"""
+Lógica compartida de scraping y limpieza de farmacias (CercaFarmacie).
+
+Importar el paquete es barato: pandas, openpyxl y Playwright se cargan
+solo dentro de las funciones que los necesitan.
+"""
+from __future__ import annotations
+
+from farmacias.core import COLS, DEDUP_KEYS, URL, clean
+
+__all__ = ["COLS", "DEDUP_KEYS", "URL", "clean"]
@@ -0,0 +1,150 @@
+"""
+Trabajos rápidos sin cargar pandas/Playwright salvo que hagan falta.
+
+    python -m farmacias direccion farmacie_milano.csv farmacie_milano_maps.csv
+    python -m farmacias total LOMBARDIA MILANO [--comune MILANO]
+    python -m farmacias scrape LAZIO ROMA [--comune ROMA] [--out x.csv] [--har record|replay]
+    python -m farmacias scrape LAZIO ROMA --split 4
+    python -m farmacias probe LAZIO:ROMA LOMBARDIA:MILANO [--solo-probe]
+    python -m farmacias mapas [farmacie_lazio_roma_provincia.csv ...] [--out mapas]
+    python -m farmacias lookup [farmacie_*.csv ...] [--port 8765]
+    python -m farmacias validar farmacie_lazio_roma_provincia.csv [--informe calidad.csv]
+"""
+from __future__ import annotations
+
+import argparse
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="farmacias")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_dir = sub.add_parser("direccion", help="Regenerar Direccion_completa")
+    p_dir.add_argument("input_file")
+    p_dir.add_argument("output_file")
+    p_dir.add_argument("--pandas", action="store_true", help="Usar pandas en vez del módulo csv")
+
+    p_tot = sub.add_parser("total", help="Total de resultados de una búsqueda (sin paginar)")
+    p_tot.add_argument("regione")
+    p_tot.add_argument("provincia")
+    p_tot.add_argument("--comune", default=None)
+    p_tot.add_argument("--perfil", default=None, help="Directorio de perfil persistente de Chromium")
+
+    p_scr = sub.add_parser("scrape", help="Crawl completo de una provincia o comune")
+    p_scr.add_argument("regione")
+    p_scr.add_argument("provincia")
+    p_scr.add_argument("--comune", default=None)
+    p_scr.add_argument("--out", default=None, help="CSV de salida (por defecto farmacie_<regione>_<provincia>_provincia.csv)")
+    p_scr.add_argument("--perfil", default=None, help="Directorio de perfil persistente de Chromium")
+    p_scr.add_argument("--har", choices=["record", "replay"], default=None, help="Grabar o reproducir el tráfico (HAR)")
+    p_scr.add_argument("--har-path", default=None, help="Ruta del HAR (por defecto har/<out>.har)")
+    p_scr.add_argument("--traza-umbral", type=float, default=None, metavar="SEG",
+                       help="Guardar trazas de Playwright de las transiciones que tarden más de SEG")
+    p_scr.add_argument("--split", type=int, default=0, metavar="N",
+                       help="Dividir la provincia por comuni y crawlear en N navegadores en paralelo")
+    p_scr.add_argument("--cprofile", default=None, metavar="OUT.prof", help="Volcar estadísticas de cProfile")
+
+    p_probe = sub.add_parser("probe", help="Crawl completo solo de las provincias que cambiaron")
+    p_probe.add_argument("targets", nargs="+", metavar="REGIONE:PROVINCIA")
+    p_probe.add_argument("--state", default="probe_state.json")
+    p_probe.add_argument("--solo-probe", action="store_true", help="No crawlear, solo informar")
+    p_probe.add_argument("--force", action="store_true", help="Crawlear aunque la firma no cambie")
+    p_probe.add_argument("--perfil", default=None, help="Directorio de perfil persistente de Chromium")
+
+    p_map = sub.add_parser("mapas", help="Agregados por Comune/CAP/Provincia para los mapas (incremental)")
+    p_map.add_argument("inputs", nargs="*", help="CSV limpios (por defecto farmacie_*_provincia.csv)")
+    p_map.add_argument("--out", default="mapas")
+    p_map.add_argument("--force", action="store_true", help="Recalcular todos los parciales")
+    p_map.add_argument("--reset", action="store_true", help="Olvidar entradas previas del manifest")
+
+    p_look = sub.add_parser("lookup", help="Servicio HTTP local de consultas (índices en memoria)")
+    p_look.add_argument("inputs", nargs="*", help="CSV a cargar (por defecto farmacie_*_provincia.csv)")
+    p_look.add_argument("--host", default="127.0.0.1")
+    p_look.add_argument("--port", type=int, default=8765)
+    p_look.add_argument("--watch", type=float, default=5.0, help="Segundos entre chequeos de recarga (0 = off)")
+
+    p_val = sub.add_parser("validar", help="Informe de calidad por regla (Codice_univoco, Partita IVA, CAP)")
+    p_val.add_argument("inputs", nargs="+")
+    p_val.add_argument("--informe", default=None, help="CSV donde guardar el informe")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "direccion":
+        from farmacias.limpieza import add_direccion_completa
+
+        n = add_direccion_completa(args.input_file, args.output_file, use_pandas=args.pandas)
+        print(f"✅ Archivo creado correctamente: {args.output_file}")
+        print(f"📍 Filas procesadas: {n}")
+    elif args.cmd == "total":
+        from farmacias.scraper import result_total
+
+        total = result_total(args.regione, args.provincia, args.comune, profile_dir=args.perfil)
+        print(f"{args.regione}/{args.provincia}: {total} resultados")
+    elif args.cmd == "scrape":
+        from farmacias.probe import default_out_csv
+        from farmacias.scraper import scrape
+
+        out_csv = args.out or default_out_csv(args.regione, args.provincia)
+        if args.split:
+            from farmacias.planner import scrape_province_split
+
+            # perfil persistente y HAR son de un solo navegador; cProfile solo ve el hilo principal
+            unsupported = {
+                "--comune": args.comune, "--perfil": args.perfil, "--har": args.har,
+                "--har-path": args.har_path, "--cprofile": args.cprofile,
+            }
+            given = [opt for opt, val in unsupported.items() if val is not None]
+            if given:
+                parser.error(f"--split no se combina con {', '.join(given)}")
+            try:
+                scrape_province_split(
+                    args.regione, args.provincia, out_csv, workers=args.split,
+                    trace_threshold=args.traza_umbral,
+                )
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return 1
+            return 0
+        scrape(
+            args.regione, args.provincia, args.comune, out_csv,
+            profile_dir=args.perfil, har_mode=args.har, har_path=args.har_path,
+            trace_threshold=args.traza_umbral, cprofile_out=args.cprofile,
+        )
+    elif args.cmd == "probe":
+        from farmacias.probe import parse_target, refresh
+
+        try:
+            targets = [parse_target(t) for t in args.targets]
+        except ValueError as e:
+            parser.error(str(e))
+        changed = refresh(
+            targets, state_file=args.state, crawl=not args.solo_probe, force=args.force,
+            profile_dir=args.perfil,
+        )
+        print(f"📋 {len(changed)}/{len(targets)} provincias con cambios")
+    elif args.cmd == "mapas":
+        from farmacias.agregados import build_aggregates
+
+        try:
+            build_aggregates(args.inputs or None, out_dir=args.out, force=args.force, reset=args.reset)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+    elif args.cmd == "validar":
+        from farmacias.core import require_pandas
+        from farmacias.validacion import check
+
+        pd = require_pandas()
+        df = pd.concat(
+            [pd.read_csv(f, dtype=str, keep_default_na=False) for f in args.inputs], ignore_index=True
+        )
+        check(df, informe_csv=args.informe)
+    elif args.cmd == "lookup":
+        from farmacias.lookup import serve
+
+        serve(args.inputs or None, host=args.host, port=args.port, watch_interval=args.watch)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+"""
+Agregados precalculados para los mapas.
+
+A partir de los CSV limpios por provincia se escriben ficheros pequeños:
+    mapas/provincia.csv   farmacias por Regione/Provincia
+    mapas/comune.csv      farmacias por Comune
+    mapas/cap.csv         farmacias por CAP
+    mapas/bins_<res>.geojson   rejilla de conteos (solo si hay coordenadas)
+
+Es incremental: cada CSV de entrada deja un parcial en mapas/_parciales/ y
+solo se recalcula si el fichero cambió (mtime + tamaño, en manifest.json).
+El parcial guarda una fila por farmacia con solo las claves (DEDUP_KEYS +
+Regione/Provincia/Comune/CAP + coordenadas), no conteos: así una farmacia que
+aparece en dos entradas (CSV de ciudad y de provincia) se cuenta una vez,
+igual que en farmacias.lookup.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from farmacias.core import DEDUP_KEYS, require_pandas
+from farmacias.export import find_coord_cols
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+OUT_DIR = "mapas"
+DEFAULT_INPUTS = "farmacie_*_provincia.csv"
+
+# grados por celda de la rejilla (≈ 11 km y ≈ 1 km)
+BIN_RESOLUTIONS = (0.1, 0.01)
+
+GROUP_COLS = ["Regione", "Provincia", "Comune", "CAP"]
+PARTIAL_COLS = DEDUP_KEYS + GROUP_COLS
+LEVELS = {
+    "provincia": ["Regione", "Provincia"],
+    "comune": ["Regione", "Provincia", "Comune"],
+    "cap": ["Regione", "Provincia", "CAP"],
+}
+
+
+def _file_sig(path: Path) -> dict:
+    st = path.stat()
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def partial_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Una fila por farmacia (deduplicada) con solo las claves y, si hay, lat/lon."""
+    df = df.drop_duplicates(subset=DEDUP_KEYS)
+    part = df[PARTIAL_COLS].assign(CAP=df["CAP"].fillna("").astype(str).str.zfill(5))
+    coords = find_coord_cols(df)
+    if coords is not None:
+        part = part.assign(lat=df[coords[0]], lon=df[coords[1]])
+    return part
+
+
+def counts_by(rows: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    return rows.groupby(cols, dropna=False).size().rename("farmacie").reset_index()
+
+
+def partial_bins(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Conteo por celda de rejilla para las filas geocodificadas; None si no hay coordenadas."""
+    pd = require_pandas()
+
+    coords = find_coord_cols(df)
+    if coords is None:
+        return None
+    lat = pd.to_numeric(df[coords[0]], errors="coerce")
+    lon = pd.to_numeric(df[coords[1]], errors="coerce")
+    ok = lat.notna() & lon.notna()
+    lat, lon = lat[ok], lon[ok]
+
+    parts = []
+    for res in BIN_RESOLUTIONS:
+        cells = pd.DataFrame({
+            "res": res,
+            "lat_bin": (lat // res).astype(int),
+            "lon_bin": (lon // res).astype(int),
+        })
+        parts.append(cells.groupby(["res", "lat_bin", "lon_bin"]).size().rename("farmacie").reset_index())
+    return pd.concat(parts, ignore_index=True)
+
+
+def _write_bins_geojson(bins: pd.DataFrame, out_dir: Path) -> None:
+    for res, g in bins.groupby("res"):
+        features = []
+        for lat_bin, lon_bin, n in g[["lat_bin", "lon_bin", "farmacie"]].itertuples(index=False, name=None):
+            s, w = round(lat_bin * res, 6), round(lon_bin * res, 6)
+            n_, e = round(s + res, 6), round(w + res, 6)
+            features.append({
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[[w, s], [e, s], [e, n_], [w, n_], [w, s]]],
+                },
+                "properties": {"farmacie": int(n)},
+            })
+        path = out_dir / f"bins_{res:g}.geojson"
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+
+
+def build_aggregates(
+    inputs: list[str] | None = None,
+    out_dir: str = OUT_DIR,
+    force: bool = False,
+    reset: bool = False,
+) -> bool:
+    """
+    Recalcula los parciales de las entradas que cambiaron y reescribe los agregados.
+    Las entradas se suman a las ya registradas en el manifest (las que siguen
+    existiendo en disco), así que build_aggregates([una_provincia]) no borra las
+    demás; reset=True olvida el manifest y usa solo las entradas dadas.
+    Devuelve False si no había nada que actualizar; FileNotFoundError si falta
+    alguna de las entradas pedidas.
+    """
+    pd = require_pandas()
+
+    out = Path(out_dir)
+    parts_dir = out / "_parciales"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+
+    if reset:
+        manifest = {}
+    requested = [Path(p) for p in inputs] if inputs else sorted(Path(".").glob(DEFAULT_INPUTS))
+    missing = [str(p) for p in requested if not p.is_file()]
+    if missing:
+        raise FileNotFoundError(f"No existe la entrada: {', '.join(missing)}")
+    known = [Path(p) for p in manifest if Path(p).exists()]
+    paths = sorted(set(known) | set(requested), key=str)
+    new_manifest = {}
+    changed = force or set(manifest) != {str(p) for p in paths}
+
+    for path in paths:
+        sig = _file_sig(path)
+        rows_path = parts_dir / f"{path.stem}.rows.csv"
+        new_manifest[str(path)] = sig
+
+        if not force and manifest.get(str(path)) == sig and rows_path.exists():
+            continue
+
+        print(f"🔄 Parcial: {path}")
+        changed = True
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        partial_rows(df).to_csv(rows_path, index=False)
+
+    if not changed:
+        print("⏭️ Agregados al día")
+        return False
+
+    if not paths:
+        # nada que agregar: no dejar agregados de entradas que ya no existen
+        for name in list(LEVELS) + ["bins_*"]:
+            for old in out.glob(f"{name}.csv" if name in LEVELS else f"{name}.geojson"):
+                old.unlink()
+        manifest_path.write_text(json.dumps({}, indent=2), encoding="utf-8")
+        print(f"⚠️ Sin entradas: agregados vaciados en {out}/")
+        return True
+
+    # deduplicar entre entradas antes de contar (keep='first' en el orden de paths,
+    # pero si una copia tiene coordenadas se queda esa)
+    rows = pd.concat(
+        [pd.read_csv(parts_dir / f"{p.stem}.rows.csv", dtype=str, keep_default_na=False) for p in paths],
+        ignore_index=True,
+    )
+    if "lat" in rows.columns:
+        rows = rows.sort_values("lat", key=lambda s: s.fillna("") == "", kind="stable")
+    rows = rows.drop_duplicates(subset=DEDUP_KEYS)
+    for name, cols in LEVELS.items():
+        counts_by(rows, cols).sort_values(cols).to_csv(out / f"{name}.csv", index=False, encoding="utf-8")
+
+    for old in out.glob("bins_*.geojson"):
+        old.unlink()
+    bins = partial_bins(rows)
+    if bins is not None and not bins.empty:
+        _write_bins_geojson(bins, out)
+
+    manifest_path.write_text(json.dumps(new_manifest, indent=2), encoding="utf-8")
+    print(f"✅ Agregados en {out}/ ({len(paths)} entradas, {len(rows)} farmacias)")
+    return True
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import re
+
+URL = "https://www.salute.gov.it/CercaFarmacie/Ricerca#FINE"
+
+# 8 columnas de la tabla de resultados
+COLS = [
+    "Denominazione",
+    "Indirizzo",
+    "CAP",
+    "Comune",
+    "Provincia",
+    "Regione",
+    "Codice_univoco",
+    "Partita_IVA",
+]
+
+DEDUP_KEYS = ["Codice_univoco", "Partita_IVA", "Indirizzo"]
+
+_WS = re.compile(r"\s+")
+_COUNTER = re.compile(r"(\d+)\s*-\s*(\d+)\s*di\s*(\d+)")
+
+
+def clean(txt: str) -> str:
+    if txt is None:
+        return ""
+    return _WS.sub(" ", txt).strip()
+
+
+def parse_counter_text(txt: str) -> tuple[int, int]:
+    """
+    Lee texto tipo: 'risultati 1 - 10 di 952'
+    Devuelve (end, total)
+    """
+    m = _COUNTER.search(txt)
+    if not m:
+        raise RuntimeError(f"No pude parsear contador resultados: {txt}")
+    _start, end, total = map(int, m.groups())
+    return end, total
+
+
+# =========================
+# IMPORTS PESADOS (lazy)
+# =========================
+def require_pandas():
+    import pandas as pd
+
+    return pd
+
+
+def require_playwright():
+    """Devuelve (sync_playwright, TimeoutError) de Playwright."""
+    from playwright.sync_api import TimeoutError as PWTimeout, sync_playwright
+
+    return sync_playwright, PWTimeout
@@ -0,0 +1,146 @@
+"""
+Exportación fuera del camino crítico.
+
+Los writers (CSV, XLSX en streaming, Parquet, GeoJSON) corren en un pool de
+hilos: el scraper entrega el DataFrame y pasa al siguiente objetivo.
+
+    with Exporter() as ex:
+        ex.submit(df, "farmacie_roma", formats=("csv", "xlsx"))
+        ...  # siguiente provincia
+    # al salir del with se espera a que terminen todas las exportaciones
+"""
+from __future__ import annotations
+
+import json
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pares (lat, lon) reconocidos para GeoJSON
+COORD_COLS = [("lat", "lon"), ("latitude", "longitude"), ("Latitud", "Longitud")]
+
+
+def write_csv(df: pd.DataFrame, path: str) -> str:
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+def write_xlsx(df: pd.DataFrame, path: str) -> str:
+    # write_only: openpyxl va volcando filas sin montar el árbol de celdas en memoria
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([str(c) for c in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        ws.append([None if _is_missing(v) else v for v in row])
+    wb.save(path)
+    return path
+
+
+def write_parquet(df: pd.DataFrame, path: str) -> str:
+    df.to_parquet(path, index=False)
+    return path
+
+
+def find_coord_cols(df: pd.DataFrame) -> tuple[str, str] | None:
+    for lat, lon in COORD_COLS:
+        if lat in df.columns and lon in df.columns:
+            return lat, lon
+    return None
+
+
+def write_geojson(df: pd.DataFrame, path: str) -> str | None:
+    """Solo filas con coordenadas; None si el DataFrame no tiene columnas de coordenadas."""
+    coords = find_coord_cols(df)
+    if coords is None:
+        return None
+    lat_col, lon_col = coords
+    props = [c for c in df.columns if c not in coords]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        first = True
+        for rec in df.to_dict("records"):
+            try:
+                lat, lon = float(rec[lat_col]), float(rec[lon_col])
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(lat) or math.isnan(lon):
+                continue
+            feature = {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {c: (None if _is_missing(rec[c]) else rec[c]) for c in props},
+            }
+            if not first:
+                f.write(",\n")
+            f.write(json.dumps(feature, ensure_ascii=False, default=str))
+            first = False
+        f.write("\n]}\n")
+    return path
+
+
+WRITERS = {
+    "csv": write_csv,
+    "xlsx": write_xlsx,
+    "parquet": write_parquet,
+    "geojson": write_geojson,
+}
+
+
+def _is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and math.isnan(v))
+
+
+class Exporter:
+    """Pool de hilos para los writers; submit() no bloquea."""
+
+    def __init__(self, max_workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._futures: list[tuple[str, Future]] = []
+
+    def submit(self, df: pd.DataFrame, base: str, formats=("csv",)) -> list[Future]:
+        """
+        base sin extensión: 'farmacie_roma' → farmacie_roma.csv, farmacie_roma.xlsx, ...
+        Los writers trabajan sobre una copia: el llamador puede seguir modificando df.
+        """
+        p = Path(base)
+        stem = p.with_suffix("") if p.suffix.lstrip(".") in WRITERS else p
+        # copia del frame (no de los str): evita carreras con los hilos de escritura
+        df = df.copy(deep=True)
+        futures = []
+        for fmt in formats:
+            if fmt not in WRITERS:
+                raise ValueError(f"Formato de exportación desconocido: {fmt}")
+            path = f"{stem}.{fmt}"
+            fut = self._pool.submit(WRITERS[fmt], df, path)
+            self._futures.append((path, fut))
+            futures.append(fut)
+        return futures
+
+    def wait(self) -> list[str]:
+        """Espera a todo lo pendiente; devuelve las rutas escritas. Relanza el primer error."""
+        written = []
+        pending, self._futures = self._futures, []
+        for path, fut in pending:
+            if fut.result() is not None:
+                print(f"✅ Exportado {path}")
+                written.append(path)
+        return written
+
+    def close(self) -> list[str]:
+        try:
+            return self.wait()
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> Exporter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,143 @@
+"""
+Almacén compacto de filas para crawls grandes.
+
+En vez de list[dict] (un dict + 8 str por fila), las filas se guardan por
+columnas:
+  - Comune/Provincia/Regione/CAP: códigos de diccionario en array('i');
+    cada texto distinto existe una sola vez.
+  - Denominazione/Indirizzo/Codice_univoco/Partita_IVA: UTF-8 concatenado en
+    un bytearray + offsets en array('i'), sin un objeto str por valor.
+Se limpia y deduplica al insertar (misma clave y keep='first' que
+rows_to_dataframe), así que los duplicados no llegan a ocupar memoria.
+
+to_dataframe() entrega las columnas codificadas como Categorical a partir de
+los códigos ya guardados, sin volver a factorizar texto. pandas copia los
+códigos al entero más pequeño que quepa (int8 con <128 valores), así que la
+copia es de 1-2 bytes por fila. Las columnas de texto ya tienen el formato de
+un StringArray de Arrow (UTF-8 + offsets int32): se entregan con dtype str
+(Arrow, como read_csv en pandas 3) a partir de una copia plana de los dos
+buffers, sin crear un str por valor. La copia deja el RowStore libre para
+seguir creciendo (un bytearray con un buffer exportado no se puede redimensionar).
+Sin pyarrow, las columnas de texto quedan como object.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from farmacias.core import COLS, DEDUP_KEYS, clean, require_pandas
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CODED_COLS = ("CAP", "Comune", "Provincia", "Regione")
+
+_IDX = {c: i for i, c in enumerate(COLS)}
+_DEDUP_IDX = tuple(_IDX[k] for k in DEDUP_KEYS)
+_KEY_SEP = "\x1f"
+
+
+class _TextColumn:
+    __slots__ = ("data", "offsets")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("i", [0])
+
+    def append(self, v: str) -> None:
+        self.data += v.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def to_list(self) -> list[str]:
+        data, off = self.data, self.offsets
+        return [data[off[i]:off[i + 1]].decode("utf-8") for i in range(len(off) - 1)]
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        return pa.StringArray.from_buffers(
+            len(self.offsets) - 1, pa.py_buffer(self.offsets.tobytes()), pa.py_buffer(bytes(self.data))
+        )
+
+
+class _CodedColumn:
+    __slots__ = ("codes", "values", "lookup")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values: list[str] = []
+        self.lookup: dict[str, int] = {}
+
+    def append(self, v: str) -> None:
+        code = self.lookup.get(v)
+        if code is None:
+            code = self.lookup[v] = len(self.values)
+            self.values.append(v)
+        self.codes.append(code)
+
+    def __getitem__(self, i: int) -> str:
+        return self.values[self.codes[i]]
+
+
+class RowStore:
+    __slots__ = ("_cols", "_seen", "_n", "duplicates")
+
+    def __init__(self, rows: Iterable[list[str]] = ()):
+        self._cols = {c: _CodedColumn() if c in CODED_COLS else _TextColumn() for c in COLS}
+        self._seen: set[bytes] = set()
+        self._n = 0
+        # filas descartadas por duplicadas (para cuadrar con el contador del sitio)
+        self.duplicates = 0
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, vals: list[str]) -> bool:
+        """Añade una fila cruda (8 valores); False si era duplicada."""
+        vals = [clean(vals[i]) if i < len(vals) else "" for i in range(len(COLS))]
+        key = _KEY_SEP.join(vals[i] for i in _DEDUP_IDX).encode("utf-8")
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+
+        for col, v in zip(COLS, vals):
+            self._cols[col].append(v)
+        self._n += 1
+        return True
+
+    def extend(self, rows: Iterable[list[str]]) -> int:
+        return sum(self.append(r) for r in rows)
+
+    def __iter__(self) -> Iterator[list[str]]:
+        cols = [self._cols[c] for c in COLS]
+        for i in range(self._n):
+            yield [col[i] for col in cols]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        pd = require_pandas()
+        import numpy as np
+
+        try:
+            import pyarrow  # noqa: F401
+
+            str_dtype = pd.StringDtype("pyarrow", na_value=np.nan)
+        except (ImportError, TypeError):
+            # sin pyarrow (o pandas sin na_value en StringDtype): str de Python
+            str_dtype = None
+
+        data = {}
+        for col in COLS:
+            column = self._cols[col]
+            if isinstance(column, _CodedColumn):
+                codes = np.frombuffer(column.codes, dtype=np.int32) if self._n else np.zeros(0, np.int32)
+                data[col] = pd.Categorical.from_codes(codes, categories=pd.Index(column.values, dtype=object))
+            elif str_dtype is not None:
+                data[col] = pd.array(column.to_arrow(), dtype=str_dtype)
+            else:
+                data[col] = pd.Series(column.to_list(), dtype=object)
+        return pd.DataFrame(data, columns=COLS)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import csv
+
+COUNTRY = "Italia"
+
+
+def direccion_completa(indirizzo: str, cap: str, comune: str, country: str = COUNTRY) -> str:
+    return f"{indirizzo.strip()}, {cap.zfill(5)} {comune.strip()}, {country}"
+
+
+def add_direccion_completa(
+    input_file: str,
+    output_file: str,
+    country: str = COUNTRY,
+    use_pandas: bool = False,
+) -> int:
+    """
+    Crea la columna Direccion_completa y guarda el nuevo CSV.
+    Por defecto usa el módulo csv (sin importar pandas); devuelve filas procesadas.
+    """
+    if use_pandas:
+        return _add_direccion_completa_pandas(input_file, output_file, country)
+
+    with open(input_file, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or []) + ["Direccion_completa"]
+        rows = list(reader)
+
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        # "\n" como to_csv de pandas (DictWriter usa "\r\n" por defecto)
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            row["Direccion_completa"] = direccion_completa(
+                row["Indirizzo"] or "", row["CAP"] or "", row["Comune"] or "", country
+            )
+            writer.writerow(row)
+
+    return len(rows)
+
+
+def _add_direccion_completa_pandas(input_file: str, output_file: str, country: str) -> int:
+    import pandas as pd
+
+    df = pd.read_csv(input_file)
+
+    df["Direccion_completa"] = (
+        df["Indirizzo"].astype(str).str.strip() + ", " +
+        df["CAP"].astype(str).str.zfill(5) + " " +
+        df["Comune"].astype(str).str.strip() + ", " +
+        country
+    )
+
+    df.to_csv(output_file, index=False, encoding="utf-8")
+    return len(df)
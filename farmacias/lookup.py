@@ -0,0 +1,210 @@
+"""
+Servicio HTTP local de consultas sobre el dataset consolidado.
+
+Carga los CSV una vez (módulo csv, sin pandas) y monta índices en memoria:
+hash por Codice_univoco, Partita_IVA y CAP, y prefijo sobre Denominazione
+normalizada (lista ordenada + bisect).
+
+    python -m farmacias lookup [farmacie_*.csv ...] [--port 8765]
+
+    GET /farmacie?cap=20090
+    GET /farmacie?nome=Farmacia Trieste&limit=20
+    GET /farmacie?piva=10151100962
+    GET /farmacie?codice=F/2986
+    GET /health
+    POST /reload
+
+Si cambia algún CSV (mtime/tamaño) el índice se reconstruye aparte y se
+sustituye de golpe: las consultas en curso nunca ven un índice a medias.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from farmacias.core import COLS, DEDUP_KEYS, clean
+
+DEFAULT_INPUTS = "farmacie_*_provincia.csv"
+DEFAULT_LIMIT = 50
+
+
+def normalize_name(txt: str) -> str:
+    # minúsculas, sin acentos, espacios colapsados
+    txt = unicodedata.normalize("NFKD", txt or "")
+    txt = "".join(ch for ch in txt if not unicodedata.combining(ch))
+    return clean(txt).casefold()
+
+
+class LookupIndex:
+    """Índices inmutables sobre una lista de filas (dict)."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.by_codice: dict[str, list[int]] = {}
+        self.by_piva: dict[str, list[int]] = {}
+        self.by_cap: dict[str, list[int]] = {}
+
+        for i, row in enumerate(rows):
+            self.by_codice.setdefault(row["Codice_univoco"], []).append(i)
+            self.by_piva.setdefault(row["Partita_IVA"], []).append(i)
+            self.by_cap.setdefault(row["CAP"], []).append(i)
+
+        names = sorted((normalize_name(row["Denominazione"]), i) for i, row in enumerate(rows))
+        self._names = [n for n, _ in names]
+        self._name_ids = [i for _, i in names]
+
+    @classmethod
+    def from_csvs(cls, paths: list[Path]) -> LookupIndex:
+        rows: list[dict] = []
+        seen: set[tuple] = set()
+        for path in paths:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    row = {c: (row.get(c) or "") for c in COLS}
+                    # CAP con ceros a la izquierda aunque el CSV lo perdiera
+                    row["CAP"] = row["CAP"].zfill(5) if row["CAP"] else ""
+                    key = tuple(row[k] for k in DEDUP_KEYS)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    rows.append(row)
+        return cls(rows)
+
+    def _take(self, ids: list[int], limit: int) -> list[dict]:
+        return [self.rows[i] for i in ids[:limit]]
+
+    def by_prefix(self, prefix: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        p = normalize_name(prefix)
+        out = []
+        j = bisect_left(self._names, p)
+        while j < len(self._names) and len(out) < limit and self._names[j].startswith(p):
+            out.append(self.rows[self._name_ids[j]])
+            j += 1
+        return out
+
+    def query(self, params: dict[str, str], limit: int = DEFAULT_LIMIT) -> list[dict]:
+        if "codice" in params:
+            return self._take(self.by_codice.get(params["codice"], []), limit)
+        if "piva" in params:
+            return self._take(self.by_piva.get(params["piva"], []), limit)
+        if "cap" in params:
+            return self._take(self.by_cap.get(params["cap"].zfill(5), []), limit)
+        if "nome" in params:
+            return self.by_prefix(params["nome"], limit)
+        raise ValueError("Parámetro de búsqueda requerido: codice, piva, cap o nome")
+
+
+class LookupService:
+    """Mantiene el índice actual y lo recarga cuando cambian los CSV."""
+
+    def __init__(self, inputs: list[str] | None = None):
+        self._inputs = inputs
+        self._lock = threading.Lock()
+        self._sig: dict = {}
+        self.index: LookupIndex = LookupIndex([])
+        self.reload(force=True)
+
+    def _paths(self) -> list[Path]:
+        if self._inputs:
+            return [Path(p) for p in self._inputs]
+        return sorted(Path(".").glob(DEFAULT_INPUTS))
+
+    def _signature(self, paths: list[Path]) -> dict:
+        sig = {}
+        for p in paths:
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            sig[str(p)] = (st.st_mtime_ns, st.st_size)
+        return sig
+
+    def reload(self, force: bool = False) -> bool:
+        with self._lock:
+            paths = self._paths()
+            sig = self._signature(paths)
+            if not force and sig == self._sig:
+                return False
+            t0 = time.perf_counter()
+            index = LookupIndex.from_csvs([Path(p) for p in sig])
+            # swap atómico de la referencia
+            self.index, self._sig = index, sig
+        print(f"🔁 Índice cargado: {len(index.rows)} farmacias de {len(sig)} CSV ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+        return True
+
+    def watch(self, interval: float = 5.0) -> threading.Thread:
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    # CSV a medio escribir: se reintenta en la siguiente vuelta
+                    print(f"⚠️ Recarga fallida: {e}")
+
+        t = threading.Thread(target=loop, name="lookup-watch", daemon=True)
+        t.start()
+        return t
+
+
+def make_handler(service: LookupService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            if url.path == "/health":
+                self._send(200, {"ok": True, "farmacie": len(service.index.rows)})
+                return
+            if url.path != "/farmacie":
+                self._send(404, {"error": "not found"})
+                return
+
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                limit = int(params.pop("limit", DEFAULT_LIMIT))
+                t0 = time.perf_counter()
+                rows = service.index.query(params, limit)
+                elapsed_us = (time.perf_counter() - t0) * 1e6
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(200, {"count": len(rows), "elapsed_us": round(elapsed_us, 1), "results": rows})
+
+        def do_POST(self) -> None:
+            if urlparse(self.path).path != "/reload":
+                self._send(404, {"error": "not found"})
+                return
+            self._send(200, {"reloaded": service.reload(force=True)})
+
+        def log_message(self, fmt, *args) -> None:
+            pass
+
+    return Handler
+
+
+def serve(inputs: list[str] | None = None, host: str = "127.0.0.1", port: int = 8765, watch_interval: float = 5.0) -> None:
+    service = LookupService(inputs)
+    if watch_interval > 0:
+        service.watch(watch_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"🔎 Lookup en http://{host}:{port}/farmacie")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
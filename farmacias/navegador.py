@@ -0,0 +1,92 @@
+"""
+Arranque de Chromium para los scrapers.
+
+Sin profile_dir: navegador efímero (perfil vacío, como siempre).
+Con profile_dir: contexto persistente; cookies, sesión TLS y caché de disco
+de CercaFarmacie sobreviven entre ejecuciones, así que los assets estáticos
+no se vuelven a descargar.
+Con har_mode: graba el tráfico en un HAR ('record') o lo reproduce sin red
+('replay') para re-extraer de forma determinista.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from farmacias.core import require_playwright
+
+PROFILE_DIR = ".pw_profile"
+HAR_DIR = "har"
+DISK_CACHE_BYTES = 200 * 1024 * 1024
+
+# headless en servidor: sin /dev/shm pequeño, sin primer arranque ni extras
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--disable-component-update",
+    "--disable-sync",
+    "--mute-audio",
+]
+
+
+def _attach_har(context, har_path: str | None, har_mode: str | None) -> None:
+    if har_mode is None:
+        return
+    if har_path is None:
+        raise ValueError("har_mode requiere har_path")
+    if har_mode == "record":
+        Path(har_path).parent.mkdir(parents=True, exist_ok=True)
+        # update=True graba todo lo que pase por la red; se escribe al cerrar el contexto
+        context.route_from_har(har_path, update=True, update_content="embed", update_mode="minimal")
+    elif har_mode == "replay":
+        if not Path(har_path).exists():
+            raise FileNotFoundError(f"No existe el HAR para replay: {har_path}")
+        # sin red: lo que no esté en el HAR se aborta
+        context.route_from_har(har_path, not_found="abort")
+    else:
+        raise ValueError(f"har_mode desconocido: {har_mode} (record|replay)")
+
+
+@contextmanager
+def open_page(
+    headless: bool = True,
+    profile_dir: str | None = None,
+    har_path: str | None = None,
+    har_mode: str | None = None,
+    **launch_kwargs,
+) -> Iterator:
+    """
+    Abre Playwright + Chromium y entrega una página; cierra todo al salir.
+    har_mode='record' guarda el tráfico en har_path; 'replay' lo sirve desde ahí sin red.
+    """
+    sync_playwright, _PWTimeout = require_playwright()
+
+    with sync_playwright() as p:
+        if profile_dir is None:
+            browser = p.chromium.launch(headless=headless, args=CHROMIUM_ARGS, **launch_kwargs)
+            context = browser.new_context()
+            try:
+                _attach_har(context, har_path, har_mode)
+                yield context.new_page()
+            finally:
+                context.close()
+                browser.close()
+            return
+
+        profile = Path(profile_dir).resolve()
+        profile.mkdir(parents=True, exist_ok=True)
+        args = CHROMIUM_ARGS + [
+            f"--disk-cache-dir={profile / 'cache'}",
+            f"--disk-cache-size={DISK_CACHE_BYTES}",
+        ]
+        context = p.chromium.launch_persistent_context(
+            str(profile), headless=headless, args=args, **launch_kwargs
+        )
+        try:
+            _attach_har(context, har_path, har_mode)
+            yield context.pages[0] if context.pages else context.new_page()
+        finally:
+            context.close()
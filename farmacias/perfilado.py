@@ -0,0 +1,80 @@
+"""
+Perfilado de transiciones lentas.
+
+TransitionProfiler mantiene un trace de Playwright en trozos (chunks): cada
+cambio de página abre un chunk y al cerrarlo solo se guarda en disco si
+tardó más que el umbral; si no, se descarta. cprofile_run() envuelve el lado
+Python en cProfile y vuelca las estadísticas de la ejecución.
+
+    playwright show-trace trazas/<...>.zip
+    python -m pstats perfil.prof
+"""
+from __future__ import annotations
+
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+TRACE_DIR = "trazas"
+SLOW_TRANSITION_S = 15.0
+
+
+class TransitionProfiler:
+    """Trace rodante: solo persiste los chunks de transiciones > threshold_s."""
+
+    def __init__(self, context, out_dir: str = TRACE_DIR, threshold_s: float = SLOW_TRANSITION_S):
+        self.context = context
+        self.out_dir = Path(out_dir)
+        self.threshold_s = threshold_s
+        self.saved: list[str] = []
+        self.timings: list[float] = []
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        context.tracing.start(screenshots=True, snapshots=True)
+
+    @contextmanager
+    def transition(self, label: str) -> Iterator[None]:
+        self.context.tracing.start_chunk(title=label)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.timings.append(elapsed)
+            if elapsed >= self.threshold_s:
+                stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                path = self.out_dir / f"{stamp}_{label}_{elapsed:.1f}s.zip"
+                self.context.tracing.stop_chunk(path=str(path))
+                self.saved.append(str(path))
+                print(f"🐢 Transición lenta {label}: {elapsed:.1f}s → {path}")
+            else:
+                # sin path: el chunk se descarta
+                self.context.tracing.stop_chunk()
+
+    def close(self) -> None:
+        self.context.tracing.stop()
+        if self.timings:
+            worst = max(self.timings)
+            print(f"⏱️ {len(self.timings)} transiciones, peor {worst:.1f}s, {len(self.saved)} trazas guardadas")
+
+
+@contextmanager
+def cprofile_run(out_path: str | None, top: int = 20) -> Iterator[None]:
+    """Envuelve el bloque en cProfile si out_path; vuelca .prof e imprime el top por tiempo acumulado."""
+    if not out_path:
+        yield
+        return
+
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(out_path)
+        print(f"📊 cProfile guardado en {out_path}")
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(top)
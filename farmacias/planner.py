@@ -0,0 +1,242 @@
+"""
+Planificador por comuni para provincias grandes.
+
+En vez de una búsqueda de provincia con ~130 páginas seguidas (Roma ≈ 1.260
+filas), se lee la lista de comuni de select[name='com'] y cada comune se
+busca y crawlea una sola vez, en N navegadores en paralelo que van tomando
+comuni de una cola común.
+
+La cola va en orden LPT (el más caro primero): el coste de cada comune se
+estima con el CSV anterior de la provincia si existe, y el capoluogo va
+delante cuando no hay estimación. Como un worker libre toma el siguiente
+comune, un comune mal estimado no desequilibra un lote fijo.
+
+Cada comune se comprueba contra su contador: el crawl tiene que llegar al
+final y las filas recogidas (más los duplicados descartados dentro del
+comune) tienen que sumar su total; si no, se reintenta. Una búsqueda sin
+tabla solo cuenta como 0 resultados si el sitio lo dice; un timeout se
+reintenta. Al final se une y deduplica igual que el crawl de provincia y la
+suma de los contadores por comune se compara con el total de la provincia:
+si algún comune falló o no cuadra, no se escribe nada (RuntimeError). El resultado tiene las mismas filas que
+scrape_province pero ordenadas por comune (orden del select), no en el orden
+de páginas de la búsqueda de provincia.
+
+Cada hilo tiene su propia instancia de sync_playwright (la API sync no se
+comparte entre hilos).
+"""
+from __future__ import annotations
+
+import math
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from farmacias.core import require_pandas, require_playwright
+from farmacias.filas import RowStore
+from farmacias.navegador import open_page
+from farmacias.perfilado import TRACE_DIR, TransitionProfiler
+from farmacias.scraper import (
+    crawl_results,
+    list_comuni,
+    parse_results_counter,
+    read_signature,
+    rows_to_dataframe,
+    scrape_province,
+    select_location,
+    submit_search,
+    write_csv,
+)
+from farmacias.validacion import check
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from farmacias.export import Exporter
+
+ROWS_PER_PAGE = 10
+# primer intento de búsqueda por comune; los reintentos usan el timeout normal de open_search
+COMUNE_TABLE_TIMEOUT = 15000
+COMUNE_RETRY_TIMEOUT = 60000
+COMUNE_ATTEMPTS = 3
+# aviso del sitio cuando la búsqueda no tiene resultados ("Nessuna farmacia ...")
+NO_RESULTS_SELECTOR = "text=/nessun[ao]?\\s/i"
+
+
+def page_cost(total: int) -> int:
+    # 1 búsqueda + una transición por página extra
+    return 1 + max(0, math.ceil(total / ROWS_PER_PAGE) - 1)
+
+
+def previous_sizes(out_csv: str) -> dict[str, int]:
+    """Filas por comune (clave casefold) del CSV de una ejecución anterior; {} si no existe."""
+    if not Path(out_csv).exists():
+        return {}
+    pd = require_pandas()
+    comuni = pd.read_csv(out_csv, usecols=["Comune"], dtype=str, keep_default_na=False)["Comune"]
+    return {str(c).casefold(): int(n) for c, n in comuni.value_counts().items()}
+
+
+def plan_order(comuni: list[str], provincia: str, sizes: dict[str, int]) -> list[str]:
+    """Orden LPT de la cola: mayor coste estimado primero; sin estimación, el capoluogo delante."""
+    capoluogo = provincia.casefold()
+
+    def key(c: str) -> tuple[int, bool]:
+        return page_cost(sizes.get(c.casefold(), 0)), c.casefold() == capoluogo
+
+    # sorted es estable: a igual coste se mantiene el orden del select
+    return sorted(comuni, key=key, reverse=True)
+
+
+def read_plan_inputs(regione: str, provincia: str, headless: bool = True) -> tuple[list[str], dict]:
+    """Lista de comuni + firma de la búsqueda de provincia (una sola carga de la página)."""
+    with open_page(headless=headless) as page:
+        select_location(page, regione, provincia)
+        comuni = list_comuni(page)
+        submit_search(page)
+        sig = read_signature(page)
+    return comuni, sig
+
+
+def _crawl_comune(page, regione: str, provincia: str, comune: str, profiler) -> tuple[int, RowStore, str | None]:
+    """
+    Búsqueda + crawl del comune, con reintentos. Devuelve (total, filas, error):
+    error=None si se recogió todo lo que dice el contador (o el sitio dice que no hay
+    resultados); si no, el motivo del último intento fallido y el intento con más filas.
+    """
+    _sync_playwright, PWTimeout = require_playwright()
+    error = None
+    best: tuple[int, RowStore] = (0, RowStore())
+    for attempt in range(COMUNE_ATTEMPTS):
+        timeout = COMUNE_TABLE_TIMEOUT if attempt == 0 else COMUNE_RETRY_TIMEOUT
+        try:
+            select_location(page, regione, provincia)
+            submit_search(page, comune, table_timeout=timeout)
+        except PWTimeout:
+            if page.locator(NO_RESULTS_SELECTOR).count() > 0:
+                return 0, RowStore(), None
+            error = f"la tabla no apareció en {timeout // 1000}s"
+            print(f"⚠️ {comune}: {error} (intento {attempt + 1}/{COMUNE_ATTEMPTS})")
+            continue
+
+        _end, total = parse_results_counter(page)
+        store, complete = crawl_results(page, profiler=profiler, label=f"{comune}: ")
+        # el contador cuenta también las filas que el RowStore descartó por duplicadas
+        got = len(store) + store.duplicates
+        if complete and got >= total:
+            return total, store, None
+        if len(store) > len(best[1]):
+            best = (total, store)
+        error = f"{got}/{total} filas" + ("" if complete else ", paginación atascada")
+        print(f"⚠️ {comune}: {error} (intento {attempt + 1}/{COMUNE_ATTEMPTS})")
+
+    return best[0], best[1], error
+
+
+def crawl_comuni(
+    regione: str,
+    provincia: str,
+    order: list[str],
+    workers: int,
+    headless: bool = True,
+    trace_threshold: float | None = None,
+) -> dict[str, tuple[int, RowStore, str | None]]:
+    """N navegadores toman comuni de la cola (en order) hasta vaciarla; {comune: (total, filas, error)}."""
+    todo: queue.SimpleQueue[str] = queue.SimpleQueue()
+    for comune in order:
+        todo.put(comune)
+    results: dict[str, tuple[int, RowStore, str | None]] = {}
+
+    def worker(n: int) -> None:
+        with open_page(headless=headless) as page:
+            profiler = None
+            if trace_threshold is not None:
+                out_dir = str(Path(TRACE_DIR) / f"planner-{n}")
+                profiler = TransitionProfiler(page.context, out_dir=out_dir, threshold_s=trace_threshold)
+            try:
+                while True:
+                    try:
+                        comune = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    results[comune] = _crawl_comune(page, regione, provincia, comune, profiler)
+            finally:
+                if profiler is not None:
+                    profiler.close()
+
+    n = max(1, min(workers, len(order)))
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="planner") as pool:
+        list(pool.map(worker, range(n)))
+    return results
+
+
+def scrape_province_split(
+    regione: str,
+    provincia: str,
+    out_csv: str,
+    workers: int = 4,
+    headless: bool = True,
+    exporter: Exporter | None = None,
+    formats=("csv",),
+    validar: bool = True,
+    trace_threshold: float | None = None,
+    strict: bool = True,
+    state_file: str | None = "probe_state.json",
+) -> pd.DataFrame:
+    """
+    Mismas filas (deduplicadas) que scrape_province, repartido por comuni en
+    paralelo; el orden es por comune, no el de la búsqueda de provincia.
+    strict: si algún comune no se pudo crawlear entero o la suma de contadores por
+        comune no cuadra con el total de la provincia, RuntimeError sin escribir
+        nada (False = solo avisar y escribir lo recogido).
+    state_file: como en scrape(), guarda la firma de la provincia para `probe`
+        (solo si todo cuadró y la exportación terminó bien).
+    Sin comuni en el select, cae a scrape_province.
+    """
+    comuni, sig = read_plan_inputs(regione, provincia, headless)
+    province_total = sig["total"]
+    print(f"🗺️ {regione}/{provincia}: {len(comuni)} comuni, {province_total} resultados")
+    if not comuni:
+        print("⚠️ Sin lista de comuni: crawl de provincia normal")
+        return scrape_province(
+            regione, provincia, out_csv, headless=headless, exporter=exporter, formats=formats,
+            validar=validar, trace_threshold=trace_threshold, state_file=state_file,
+        )
+
+    order = plan_order(comuni, provincia, previous_sizes(out_csv))
+    results = crawl_comuni(regione, provincia, order, workers, headless, trace_threshold)
+
+    # unir en el orden del select para que el resultado sea estable
+    merged = RowStore()
+    n_rows = 0
+    for c in comuni:
+        _total, part, _error = results[c]
+        n_rows += len(part)
+        merged.extend(part)
+
+    problems = [f"{c}: {error}" for c in comuni if (error := results[c][2]) is not None]
+    comuni_total = sum(total for total, _part, _error in results.values())
+    if comuni_total != province_total:
+        problems.append(f"totales no cuadran: provincia {province_total}, suma comuni {comuni_total}")
+    if problems:
+        msg = "Crawl por comuni incompleto — " + "; ".join(problems)
+        if strict:
+            raise RuntimeError(msg)
+        print(f"⚠️ {msg}")
+
+    df = rows_to_dataframe(merged)
+    print(f"🧩 {n_rows} filas de {len(comuni)} comuni → {len(df)} únicas")
+    if validar:
+        check(df)
+    if exporter is None:
+        write_csv(df, out_csv)
+        futures = []
+    else:
+        futures = exporter.submit(df, out_csv, formats)
+
+    if state_file and not problems:
+        from farmacias.probe import record_after_export
+
+        record_after_export(futures, regione, provincia, sig, out_csv, len(df), state_file)
+
+    return df
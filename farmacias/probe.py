@@ -0,0 +1,173 @@
+"""
+Probe barato de cambios por provincia.
+
+Solo se hace la búsqueda y se lee la firma (total del contador + primera fila).
+Si coincide con la guardada en el último crawl completo, la provincia se salta;
+si no, se pagina desde esa misma página (el probe es la página 1 del crawl).
+"""
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from pathlib import Path
+
+from farmacias.export import Exporter
+from farmacias.navegador import open_page
+from farmacias.validacion import check
+from farmacias.scraper import (
+    crawl_results,
+    open_search,
+    read_signature,
+    rows_to_dataframe,
+)
+
+STATE_FILE = "probe_state.json"
+# record_crawl puede llegar desde los hilos del Exporter
+_STATE_LOCK = threading.Lock()
+
+
+def target_key(regione: str, provincia: str) -> str:
+    return f"{regione}/{provincia}"
+
+
+def default_out_csv(regione: str, provincia: str) -> str:
+    # mismo patrón que farmacie_lazio_roma_provincia.csv
+    return f"farmacie_{regione.lower()}_{provincia.lower()}_provincia.csv".replace(" ", "_")
+
+
+def load_state(state_file: str = STATE_FILE) -> dict:
+    path = Path(state_file)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(state: dict, state_file: str = STATE_FILE) -> None:
+    path = Path(state_file)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def record_crawl(
+    regione: str,
+    provincia: str,
+    sig: dict,
+    out_csv: str,
+    rows: int,
+    state_file: str = STATE_FILE,
+) -> None:
+    """Guarda la firma de un crawl completo de provincia (refresh o scrape)."""
+    with _STATE_LOCK:
+        state = load_state(state_file)
+        state[target_key(regione, provincia)] = {
+            **sig,
+            "out_csv": out_csv,
+            "rows": rows,
+            "crawled_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        save_state(state, state_file)
+
+
+def record_after_export(
+    futures: list[Future],
+    regione: str,
+    provincia: str,
+    sig: dict,
+    out_csv: str,
+    rows: int,
+    state_file: str = STATE_FILE,
+) -> None:
+    """
+    record_crawl cuando todas las exportaciones del crawl terminaron sin error
+    (sin futures: la escritura ya fue síncrona, se guarda ya).
+    Si alguna falla, la provincia sigue sin firma y el próximo probe la repite.
+    """
+    if not futures:
+        record_crawl(regione, provincia, sig, out_csv, rows, state_file)
+        return
+
+    lock = threading.Lock()
+    pending = [len(futures)]
+
+    def done(_fut: Future) -> None:
+        with lock:
+            pending[0] -= 1
+            if pending[0]:
+                return
+        failed = [f for f in futures if f.exception() is not None]
+        if failed:
+            print(f"⚠️ {target_key(regione, provincia)}: exportación fallida, no se guarda la firma")
+            return
+        record_crawl(regione, provincia, sig, out_csv, rows, state_file)
+
+    for fut in futures:
+        fut.add_done_callback(done)
+
+
+def parse_target(txt: str) -> tuple[str, str]:
+    """'REGIONE:PROVINCIA' → (regione, provincia); ValueError si no tiene ese formato."""
+    regione, sep, provincia = txt.partition(":")
+    if not sep or not regione.strip() or not provincia.strip():
+        raise ValueError(f"Objetivo inválido {txt!r}: se espera REGIONE:PROVINCIA")
+    return regione.strip(), provincia.strip()
+
+
+def same_signature(old: dict | None, new: dict) -> bool:
+    if not old:
+        return False
+    return old.get("total") == new["total"] and old.get("first_row") == new["first_row"]
+
+
+def refresh(
+    targets: list[tuple[str, str]],
+    state_file: str = STATE_FILE,
+    crawl: bool = True,
+    force: bool = False,
+    headless: bool = True,
+    formats=("csv",),
+    profile_dir: str | None = None,
+) -> list[str]:
+    """
+    Hace probe de cada (regione, provincia) y crawl completo solo de las que cambiaron.
+    crawl=False → solo probe (no actualiza el estado).
+    Las exportaciones (formats) corren en segundo plano mientras se sigue con la siguiente provincia.
+    Devuelve las claves 'REGIONE/PROVINCIA' que cambiaron.
+    """
+    state = load_state(state_file)
+    changed: list[str] = []
+
+    with Exporter() as exporter, open_page(headless=headless, profile_dir=profile_dir) as page:
+        for regione, provincia in targets:
+            key = target_key(regione, provincia)
+
+            open_search(page, regione, provincia)
+            sig = read_signature(page)
+
+            if not force and same_signature(state.get(key), sig):
+                print(f"⏭️ {key}: sin cambios ({sig['total']} resultados)")
+                continue
+
+            old_total = (state.get(key) or {}).get("total")
+            print(f"🔄 {key}: cambió ({old_total} → {sig['total']})")
+            changed.append(key)
+
+            if not crawl:
+                continue
+
+            out_csv = default_out_csv(regione, provincia)
+            store, complete = crawl_results(page)
+            df = rows_to_dataframe(store)
+            check(df)
+            futures = exporter.submit(df, out_csv, formats)
+
+            # guardar tras cada provincia (cuando su exportación termine bien): si algo
+            # revienta no se repite lo hecho; un crawl incompleto no se da por bueno
+            if complete:
+                record_after_export(futures, regione, provincia, sig, out_csv, len(df), state_file)
+            else:
+                print(f"⚠️ {key}: crawl incompleto, se repetirá en el próximo probe")
+
+    return changed
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from farmacias.core import URL, clean, parse_counter_text, require_playwright
+from farmacias.filas import RowStore
+from farmacias.navegador import HAR_DIR, open_page
+from farmacias.perfilado import TransitionProfiler, cprofile_run
+from farmacias.validacion import check
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from farmacias.export import Exporter
+
+TABLE_SELECTOR = "table:has-text('Denominazione'):has-text('Indirizzo')"
+
+
+def parse_results_counter(page) -> tuple[int, int]:
+    """
+    Lee texto tipo: 'risultati 1 - 10 di 952'
+    Devuelve (end, total)
+    """
+    txt = page.locator("text=/risultati/i").first.inner_text()
+    return parse_counter_text(txt)
+
+
+def extract_table_rows(page) -> list[list[str]]:
+    # 8 columnas
+    return page.evaluate(
+        """() => {
+            const t = Array.from(document.querySelectorAll("table"))
+              .find(tb => tb.innerText.includes("Denominazione") && tb.innerText.includes("Indirizzo"));
+            if (!t) return [];
+            return Array.from(t.querySelectorAll("tbody tr")).map(tr =>
+                Array.from(tr.querySelectorAll("td")).slice(0, 8).map(td =>
+                    (td.innerText || "").replace(/\\s+/g, " ").trim()
+                )
+            );
+        }"""
+    )
+
+
+def first_row_fingerprint(page) -> str:
+    # una “firma” estable de la tabla (primera fila)
+    return page.evaluate(
+        """() => {
+            const t = Array.from(document.querySelectorAll("table"))
+              .find(tb => tb.innerText.includes("Denominazione") && tb.innerText.includes("Indirizzo"));
+            const r = t?.querySelector("tbody tr");
+            return r ? r.innerText.replace(/\\s+/g, " ").trim() : "";
+        }"""
+    )
+
+
+def click_next_and_wait(
+    page,
+    prev_end: int,
+    prev_fp: str,
+    max_tries: int = 7,
+    profiler: TransitionProfiler | None = None,
+) -> bool:
+    """
+    Intenta avanzar de página. Devuelve True si detecta cambio, False si no hay botón o no avanza.
+    Detecta cambio por:
+      - contador end aumenta, o
+      - cambia fingerprint de primera fila
+    Con profiler, la transición se traza y se guarda solo si supera su umbral.
+    """
+    if profiler is None:
+        return _click_next_and_wait(page, prev_end, prev_fp, max_tries)
+    with profiler.transition(f"tras_{prev_end}"):
+        return _click_next_and_wait(page, prev_end, prev_fp, max_tries)
+
+
+def _click_next_and_wait(page, prev_end: int, prev_fp: str, max_tries: int) -> bool:
+    _sync_playwright, PWTimeout = require_playwright()
+
+    next_btn = page.locator(
+        "a[title*='successiva' i], button:has-text('>'), input[value='>'], a:has-text('>')"
+    ).first
+
+    if next_btn.count() == 0:
+        return False
+
+    for _ in range(max_tries):
+        try:
+            next_btn.click()
+        except Exception:
+            page.wait_for_timeout(300)
+            continue
+
+        # Esperar a que ocurra *algo* (contador o tabla)
+        try:
+            page.wait_for_function(
+                """([prevEnd, prevFp]) => {
+                    // contador
+                    const el = Array.from(document.querySelectorAll("*"))
+                      .find(n => n.innerText && /risultati/i.test(n.innerText));
+                    let endNow = null;
+                    if (el) {
+                      const m = el.innerText.match(/\\d+\\s*-\\s*(\\d+)\\s*di\\s*(\\d+)/i);
+                      if (m) endNow = parseInt(m[1], 10);
+                    }
+
+                    // fingerprint primera fila
+                    const t = Array.from(document.querySelectorAll("table"))
+                      .find(tb => tb.innerText.includes("Denominazione") && tb.innerText.includes("Indirizzo"));
+                    const r = t?.querySelector("tbody tr");
+                    const fpNow = r ? r.innerText.replace(/\\s+/g, " ").trim() : "";
+
+                    const movedByCounter = (endNow !== null) && (endNow > prevEnd);
+                    const movedByTable = (fpNow !== "") && (fpNow !== prevFp);
+
+                    return movedByCounter || movedByTable;
+                }""",
+                arg=[prev_end, prev_fp],
+                timeout=15000,
+            )
+            return True
+        except PWTimeout:
+            # no cambió aún → pausa y reintenta click
+            page.wait_for_timeout(600)
+
+    # tras varios intentos, asumimos que no avanza
+    return False
+
+
+def select_location(page, regione: str, provincia: str) -> None:
+    """Abre CercaFarmacie y deja Regione/Provincia elegidas, con Comune ya cargado."""
+    page.goto(URL, wait_until="domcontentloaded", timeout=60000)
+
+    # Selects reales
+    reg = page.locator("select[name='reg']")
+    prv = page.locator("select[name='prv']")
+
+    reg.select_option(label=regione)
+
+    page.wait_for_function(
+        """() => {
+            const s = document.querySelector("select[name='prv']");
+            return s && s.options.length > 1;
+        }""",
+        timeout=60000,
+    )
+
+    try:
+        prv.select_option(label=provincia)
+    except Exception:
+        # fallback por si el label fuera distinto (p.ej. abreviatura)
+        prv.select_option(value=provincia)
+
+    page.wait_for_function(
+        """() => {
+            const s = document.querySelector("select[name='com']");
+            return s && s.options.length > 1;
+        }""",
+        timeout=60000,
+    )
+
+
+def list_comuni(page) -> list[str]:
+    """Labels del select[name='com'] (sin la primera opción, que es 'toda la provincia')."""
+    labels = [clean(x) for x in page.locator("select[name='com'] option").all_inner_texts()]
+    return [x for x in labels[1:] if x and x != "-"]
+
+
+def open_search(
+    page,
+    regione: str,
+    provincia: str,
+    comune: str | None = None,
+    table_timeout: int = 60000,
+) -> None:
+    """
+    Abre CercaFarmacie, rellena Regione/Provincia/Comune y pulsa Cerca.
+    comune=None → toda la provincia (primera opción del select).
+    """
+    select_location(page, regione, provincia)
+    submit_search(page, comune, table_timeout)
+
+
+def submit_search(page, comune: str | None = None, table_timeout: int = 60000) -> None:
+    """Con Regione/Provincia ya elegidas (select_location), elige Comune y pulsa Cerca."""
+    com = page.locator("select[name='com']")
+    if comune is None:
+        # NO seleccionar comune → toda la provincia
+        com.select_option(index=0)
+    else:
+        com.select_option(label=comune)
+
+    page.locator("input[value='Cerca'], button:has-text('Cerca')").first.click()
+
+    page.wait_for_selector(TABLE_SELECTOR, timeout=table_timeout)
+
+
+def read_signature(page) -> dict:
+    """Firma de la búsqueda actual: {'total': int, 'first_row': str}"""
+    _end, total = parse_results_counter(page)
+    return {"total": total, "first_row": first_row_fingerprint(page)}
+
+
+def crawl_results(
+    page,
+    profiler: TransitionProfiler | None = None,
+    label: str = "",
+    store: RowStore | None = None,
+) -> tuple[RowStore, bool]:
+    """
+    Recorre todas las páginas de resultados; filas limpias y deduplicadas en un RowStore.
+    Devuelve (store, completo): completo=False si la paginación se atascó antes
+    de llegar al final del contador (el store tiene solo lo extraído hasta ahí).
+    """
+    store = RowStore() if store is None else store
+
+    # Loop paginación robusto
+    while True:
+        store.extend(extract_table_rows(page))
+
+        end, total = parse_results_counter(page)
+        print(f"➡️ {label}Progreso: {end}/{total}")
+
+        if end >= total:
+            return store, True
+
+        fp = first_row_fingerprint(page)
+        moved = click_next_and_wait(page, prev_end=end, prev_fp=fp, max_tries=7, profiler=profiler)
+
+        if not moved:
+            # No reventamos: guardamos y salimos
+            print("⚠️ No pude avanzar de página tras varios intentos. Guardando lo extraído y saliendo.")
+            return store, False
+
+
+def rows_to_dataframe(all_rows: RowStore | Iterable[list[str]]) -> pd.DataFrame:
+    """Limpia + deduplica (DEDUP_KEYS, keep='first'); Comune/Provincia/Regione como category."""
+    store = all_rows if isinstance(all_rows, RowStore) else RowStore(all_rows)
+    return store.to_dataframe()
+
+
+def default_har_path(out_csv: str) -> str:
+    return str(Path(HAR_DIR) / f"{Path(out_csv).stem}.har")
+
+
+def write_csv(df: pd.DataFrame, out_csv: str) -> None:
+    df.to_csv(out_csv, index=False, encoding="utf-8-sig")
+    print(f"✅ Guardado {out_csv} ({len(df)} filas)")
+
+
+def scrape(
+    regione: str,
+    provincia: str,
+    comune: str | None,
+    out_csv: str,
+    headless: bool = True,
+    exporter: Exporter | None = None,
+    formats=("csv",),
+    profile_dir: str | None = None,
+    har_mode: str | None = None,
+    har_path: str | None = None,
+    validar: bool = True,
+    trace_threshold: float | None = None,
+    cprofile_out: str | None = None,
+    state_file: str | None = "probe_state.json",
+) -> pd.DataFrame:
+    """
+    Crawl completo de una búsqueda. Con exporter, la escritura (formats)
+    se encola en segundo plano y se devuelve el DataFrame sin esperar.
+    profile_dir: perfil persistente de Chromium (caché caliente entre ejecuciones).
+    har_mode: 'record' guarda el tráfico en har/<out_csv>.har; 'replay' re-extrae desde él sin red.
+    validar: imprime el informe de calidad (farmacias.validacion) antes de guardar.
+    trace_threshold: guarda trazas de Playwright solo de las transiciones más lentas (segundos).
+    cprofile_out: envuelve el crawl en cProfile y vuelca las estadísticas ahí.
+    state_file: en crawls de provincia (comune=None) guarda la firma de la página 1
+        para que `probe` no vuelva a crawlear si nada cambió (None = no guardar).
+        Solo si el crawl llegó al final y, con exporter, cuando la exportación terminó bien.
+    """
+    if har_mode is not None and har_path is None:
+        har_path = default_har_path(out_csv)
+
+    with cprofile_run(cprofile_out), open_page(
+        headless=headless, profile_dir=profile_dir, har_path=har_path, har_mode=har_mode
+    ) as page:
+        profiler = None if trace_threshold is None else TransitionProfiler(page.context, threshold_s=trace_threshold)
+        try:
+            open_search(page, regione, provincia, comune)
+            sig = read_signature(page) if comune is None else None
+            store, complete = crawl_results(page, profiler=profiler)
+        finally:
+            if profiler is not None:
+                profiler.close()
+
+    df = rows_to_dataframe(store)
+    if validar:
+        check(df)
+    if exporter is None:
+        write_csv(df, out_csv)
+        futures = []
+    else:
+        futures = exporter.submit(df, out_csv, formats)
+
+    # un replay de HAR no dice nada del estado actual del sitio, y un crawl
+    # incompleto no puede marcar la provincia como al día
+    if sig is not None and state_file and har_mode != "replay":
+        if complete:
+            from farmacias.probe import record_after_export
+
+            record_after_export(futures, regione, provincia, sig, out_csv, len(df), state_file)
+        else:
+            print("⚠️ Crawl incompleto: no se guarda la firma en el estado de probe")
+
+    return df
+
+
+def scrape_city(regione: str, provincia: str, comune: str, out_csv: str, headless: bool = True, **kwargs) -> pd.DataFrame:
+    return scrape(regione, provincia, comune, out_csv, headless=headless, **kwargs)
+
+
+def scrape_province(regione: str, provincia: str, out_csv: str, headless: bool = True, **kwargs) -> pd.DataFrame:
+    return scrape(regione, provincia, None, out_csv, headless=headless, **kwargs)
+
+
+def result_total(
+    regione: str,
+    provincia: str,
+    comune: str | None = None,
+    headless: bool = True,
+    profile_dir: str | None = None,
+) -> int:
+    """Solo la búsqueda: devuelve el total de resultados sin paginar."""
+    with open_page(headless=headless, profile_dir=profile_dir) as page:
+        open_search(page, regione, provincia, comune)
+        _end, total = parse_results_counter(page)
+
+    return total
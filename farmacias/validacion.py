@@ -0,0 +1,169 @@
+"""
+Validación de calidad de datos, vectorizada sobre todo el dataset.
+
+Reglas (True = la fila falla):
+    codice_univoco   no es 'F/<dígitos>'
+    piva_formato     Partita_IVA sin exactamente 11 dígitos
+    piva_checksum    11 dígitos pero el dígito de control no cuadra
+    cap_formato      CAP sin 5 dígitos
+    cap_rango        CAP fuera del rango de su provincia (si la provincia está en CAP_RANGES)
+
+Informativa (no cuenta como fallo):
+    cap_sin_rango    CAP válido pero su provincia no está en CAP_RANGES (no comprobado)
+
+CAP y Partita_IVA leídos como números (read_csv sin dtype=str) se rellenan
+con ceros a la izquierda antes de validar.
+
+El dígito de control de la Partita IVA se calcula sobre una matriz (n, 11)
+de dígitos uint8, sin bucles por fila.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from farmacias.core import require_pandas
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rangos de CAP por sigla de provincia (inclusive). XY000–XY199 cubre comuni
+# (XY010–XY099) y capoluogo (XY100–XY1xx) de las provincias históricas.
+CAP_RANGES: dict[str, list[tuple[int, int]]] = {
+    "RM": [(0, 199)],
+    "MI": [(20000, 20199)],
+    "TO": [(10000, 10199)],
+    "GE": [(16000, 16199)],
+    "VE": [(30000, 30199)],
+    "BO": [(40000, 40199)],
+    "FI": [(50000, 50199)],
+    "BA": [(70000, 70199)],
+    "NA": [(80000, 80199)],
+    "PA": [(90000, 90199)],
+    # provincias nuevas con CAP propios dentro del bloque de la histórica
+    "MB": [(20811, 20900)],
+}
+
+RULES = {
+    "codice_univoco": "Codice_univoco no es F/<dígitos>",
+    "piva_formato": "Partita_IVA sin 11 dígitos",
+    "piva_checksum": "Partita_IVA con dígito de control erróneo",
+    "cap_formato": "CAP sin 5 dígitos",
+    "cap_rango": "CAP fuera del rango de la provincia",
+    "cap_sin_rango": "CAP no comprobado (provincia sin rango en CAP_RANGES)",
+}
+# reglas que solo informan: no cuentan para "Validación OK"
+INFO_RULES = {"cap_sin_rango"}
+
+
+def piva_checksum_ok(digits):
+    """
+    digits: matriz (n, 11) de enteros 0-9. Devuelve array bool (n,).
+    Posiciones impares (1ª, 3ª, ... 9ª): se suman tal cual.
+    Posiciones pares (2ª, ... 10ª): se doblan y se resta 9 si pasa de 9.
+    Control = (10 - suma % 10) % 10 == 11ª cifra.
+    """
+    odd = digits[:, 0:10:2].sum(axis=1)
+    doubled = digits[:, 1:10:2].astype("int16") * 2
+    even = (doubled - 9 * (doubled > 9)).sum(axis=1)
+    return (10 - (odd + even) % 10) % 10 == digits[:, 10]
+
+
+def _digit_matrix(values, width: int):
+    import numpy as np
+
+    if len(values) == 0:
+        return np.zeros((0, width), dtype=np.uint8)
+    buf = "".join(values).encode("ascii")
+    return np.frombuffer(buf, dtype=np.uint8).reshape(-1, width) - ord("0")
+
+
+def _text(s: pd.Series) -> pd.Series:
+    # astype(object) primero: fillna("") no vale sobre columnas category
+    return s.astype(object).fillna("").astype(str).str.strip()
+
+
+def _digits_text(s: pd.Series, width: int) -> pd.Series:
+    """Como _text, pero una columna numérica (CAP 118, P.IVA 1234567890) recupera sus ceros."""
+    pd = require_pandas()
+
+    if not pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        return _text(s)
+    num = pd.to_numeric(s, errors="coerce")
+    whole = num.notna() & (num % 1 == 0)
+    out = _text(s)
+    out[whole] = num[whole].astype("int64").astype(str).str.zfill(width)
+    return out
+
+
+def validate(df: pd.DataFrame, cap_ranges: dict[str, list[tuple[int, int]]] | None = None) -> pd.DataFrame:
+    """Devuelve un DataFrame bool (mismo índice que df) con una columna por regla."""
+    pd = require_pandas()
+    import numpy as np
+
+    ranges = CAP_RANGES if cap_ranges is None else cap_ranges
+
+    codice = _text(df["Codice_univoco"])
+    piva = _digits_text(df["Partita_IVA"], 11)
+    cap = _digits_text(df["CAP"], 5)
+
+    fails = pd.DataFrame(index=df.index)
+    fails["codice_univoco"] = ~codice.str.fullmatch(r"F/\d+")
+
+    piva_ok_fmt = piva.str.fullmatch(r"[0-9]{11}")
+    fails["piva_formato"] = ~piva_ok_fmt
+
+    checksum_bad = np.zeros(len(df), dtype=bool)
+    fmt_mask = piva_ok_fmt.to_numpy()
+    checksum_bad[fmt_mask] = ~piva_checksum_ok(_digit_matrix(piva[fmt_mask].tolist(), 11))
+    fails["piva_checksum"] = checksum_bad
+
+    cap_ok_fmt = cap.str.fullmatch(r"[0-9]{5}")
+    fails["cap_formato"] = ~cap_ok_fmt
+
+    # Rango: solo filas con CAP válido y provincia con rango conocido
+    sigla = _text(df["Provincia"]).str.extract(r"\(([A-Z]{2})\)\s*$", expand=False)
+    cap_num = pd.to_numeric(cap.where(cap_ok_fmt), errors="coerce")
+    in_range = pd.Series(False, index=df.index)
+    known = pd.Series(False, index=df.index)
+    for sig, spans in ranges.items():
+        is_sig = sigla == sig
+        known |= is_sig
+        for lo, hi in spans:
+            in_range |= is_sig & cap_num.between(lo, hi)
+    fails["cap_rango"] = known & cap_ok_fmt & ~in_range
+    fails["cap_sin_rango"] = ~known & cap_ok_fmt
+
+    return fails
+
+
+def quality_report(fails: pd.DataFrame) -> pd.DataFrame:
+    pd = require_pandas()
+
+    n = len(fails)
+    counts = fails.sum()
+    return pd.DataFrame({
+        "regla": list(RULES),
+        "descripcion": [RULES[r] for r in RULES],
+        "filas_ko": [int(counts[r]) for r in RULES],
+        "pct_ko": [round(100 * counts[r] / n, 3) if n else 0.0 for r in RULES],
+    })
+
+
+def print_report(report: pd.DataFrame, total: int) -> None:
+    hit = report[report["filas_ko"] > 0]
+    bad = hit[~hit["regla"].isin(INFO_RULES)]
+    if bad.empty:
+        print(f"✅ Validación OK ({total} filas)")
+    for r in bad.itertuples(index=False):
+        print(f"⚠️ {r.regla}: {r.filas_ko} filas ({r.pct_ko}%) — {r.descripcion}")
+    for r in hit[hit["regla"].isin(INFO_RULES)].itertuples(index=False):
+        print(f"ℹ️ {r.regla}: {r.filas_ko} filas ({r.pct_ko}%) — {r.descripcion}")
+
+
+def check(df: pd.DataFrame, informe_csv: str | None = None) -> pd.DataFrame:
+    """Valida, imprime el resumen y (opcional) guarda el informe por regla."""
+    report = quality_report(validate(df))
+    print_report(report, len(df))
+    if informe_csv:
+        report.to_csv(informe_csv, index=False, encoding="utf-8")
+    return report
@@ -1,5 +1,4 @@
-import pandas as pd
-from pathlib import Path
+from farmacias.limpieza import add_direccion_completa
 
 # =========================
 # CONFIGURACIÓN
@@ -10,24 +9,10 @@ OUTPUT_FILE = "farmacie_lombardia_milano_provincia_maps.csv"
 COUNTRY = "Italia"
 
 # =========================
-# CARGAR CSV
+# CREAR COLUMNA DIRECCION_COMPLETA Y GUARDAR
 # =========================
-df = pd.read_csv(INPUT_FILE)
-
-# =========================
-# CREAR COLUMNA DIRECCION_COMPLETA
-# =========================
-df["Direccion_completa"] = (
-    df["Indirizzo"].astype(str).str.strip() + ", " +
-    df["CAP"].astype(str).str.zfill(5) + " " +
-    df["Comune"].astype(str).str.strip() + ", " +
-    COUNTRY
-)
-
-# =========================
-# GUARDAR NUEVO CSV
-# =========================
-df.to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
+# Módulo csv: sin pandas, arranque inmediato (use_pandas=True para el camino antiguo)
+n = add_direccion_completa(INPUT_FILE, OUTPUT_FILE, country=COUNTRY)
 
 print(f"✅ Archivo creado correctamente: {OUTPUT_FILE}")
-print(f"📍 Filas procesadas: {len(df)}")
+print(f"📍 Filas procesadas: {n}")
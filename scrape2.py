@@ -1,20 +1,19 @@
 from __future__ import annotations
 
-import re
-import pandas as pd
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from typing import TYPE_CHECKING
 
-URL = "https://www.salute.gov.it/CercaFarmacie/Ricerca#FINE"
+from farmacias.core import URL, clean, require_playwright
+from farmacias.filas import RowStore
+from farmacias.scraper import rows_to_dataframe
 
-
-def clean(txt: str) -> str:
-    if txt is None:
-        return ""
-    return re.sub(r"\s+", " ", txt).strip()
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def scrape_roma() -> pd.DataFrame:
-    rows_out: list[dict] = []
+    sync_playwright, PWTimeout = require_playwright()
+
+    rows_out = RowStore()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False, slow_mo=200)
@@ -92,18 +91,8 @@ def scrape_roma() -> pd.DataFrame:
                 tr = trs.nth(r)
                 tds = tr.locator("td")
                 vals = [clean(tds.nth(i).inner_text()) for i in range(min(9, tds.count()))]
-                rows_out.append(
-                    {
-                        "Denominazione": vals[0] if len(vals) > 0 else "",
-                        "Indirizzo": vals[1] if len(vals) > 1 else "",
-                        "CAP": vals[2] if len(vals) > 2 else "",
-                        "Comune": vals[3] if len(vals) > 3 else "",
-                        "Provincia": vals[4] if len(vals) > 4 else "",
-                        "Regione": vals[5] if len(vals) > 5 else "",
-                        "Codice_univoco": vals[6] if len(vals) > 6 else "",
-                        "Partita_IVA": vals[7] if len(vals) > 7 else "",
-                    }
-                )
+                # RowStore rellena columnas que falten y deduplica al insertar
+                rows_out.append(vals)
 
         def go_next() -> bool:
             next_btn = page.locator("button:has-text('>'), input[value='>']").first
@@ -139,44 +128,26 @@ def scrape_roma() -> pd.DataFrame:
                 page.wait_for_timeout(800)
             return True
 
-        seen = set()
         while True:
             read_current_page()
-
-            df_tmp = pd.DataFrame(rows_out)
-            if df_tmp.empty:
+            if len(rows_out) == 0:
                 break
 
-            df_tmp["__k"] = (
-                df_tmp["Codice_univoco"].fillna("")
-                + "|"
-                + df_tmp["Partita_IVA"].fillna("")
-                + "|"
-                + df_tmp["Indirizzo"].fillna("")
-            )
-
-            new_rows = []
-            for _, row in df_tmp.iterrows():
-                k = row["__k"]
-                if k in seen:
-                    continue
-                seen.add(k)
-                new_rows.append({c: row[c] for c in df_tmp.columns if c != "__k"})
-            rows_out = new_rows
-
             if not go_next():
                 break
 
         browser.close()
 
-    df = pd.DataFrame(rows_out).drop_duplicates(subset=["Codice_univoco", "Partita_IVA", "Indirizzo"], keep="first")
+    df = rows_to_dataframe(rows_out)
     return df
 
 
 if __name__ == "__main__":
-    df = scrape_roma()
-    print(f"Filas extraídas: {len(df)}")
+    from farmacias.export import Exporter
+
+    with Exporter() as exporter:
+        df = scrape_roma()
+        print(f"Filas extraídas: {len(df)}")
 
-    df.to_csv("farmacie_roma.csv", index=False, encoding="utf-8-sig")
-    df.to_excel("farmacie_roma.xlsx", index=False)
-    print("Guardado: farmacie_roma.csv y farmacie_roma.xlsx")
+        # CSV + XLSX (streaming) en segundo plano
+        exporter.submit(df, "farmacie_roma", formats=("csv", "xlsx"))
@@ -1,26 +1,29 @@
 from __future__ import annotations
 
-import re
-import pandas as pd
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from typing import TYPE_CHECKING
 
-URL = "https://www.salute.gov.it/CercaFarmacie/Ricerca#FINE"
+from farmacias.core import URL, require_playwright
+from farmacias.filas import RowStore
+from farmacias.navegador import open_page
+from farmacias.perfilado import TransitionProfiler
+from farmacias.scraper import default_har_path, rows_to_dataframe
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def clean(txt: str) -> str:
-    if txt is None:
-        return ""
-    return re.sub(r"\s+", " ", txt).strip()
 
+def scrape_roma(
+    profile_dir: str | None = None,
+    har_mode: str | None = None,
+    trace_threshold: float | None = None,
+) -> pd.DataFrame:
+    _sync_playwright, PWTimeout = require_playwright()
 
-def scrape_roma() -> pd.DataFrame:
-    all_rows: list[list[str]] = []
-
-    with sync_playwright() as p:
-        # MÁS RÁPIDO: headless + sin slow_mo
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    store = RowStore()
 
+    # MÁS RÁPIDO: headless + sin slow_mo (+ perfil persistente opcional)
+    har_path = default_har_path("farmacie_roma.csv") if har_mode else None
+    with open_page(headless=True, profile_dir=profile_dir, har_path=har_path, har_mode=har_mode) as page:
         # Un poco más de margen a la red
         page.goto(URL, wait_until="domcontentloaded", timeout=60000)
 
@@ -131,37 +134,30 @@ def scrape_roma() -> pd.DataFrame:
 
             return True
 
-        # Paginación
-        while True:
-            all_rows.extend(extract_table_rows())
-            if not click_next_and_wait():
-                break
-
-        browser.close()
-
-    # Convertir a DF (8 columnas)
-    cols = [
-        "Denominazione",
-        "Indirizzo",
-        "CAP",
-        "Comune",
-        "Provincia",
-        "Regione",
-        "Codice_univoco",
-        "Partita_IVA",
-    ]
-    df = pd.DataFrame(all_rows, columns=cols)
+        # Paginación (con trazas solo de las transiciones lentas si trace_threshold)
+        profiler = None if trace_threshold is None else TransitionProfiler(page.context, threshold_s=trace_threshold)
+        try:
+            while True:
+                store.extend(extract_table_rows())
+                if profiler is None:
+                    moved = click_next_and_wait()
+                else:
+                    with profiler.transition(f"tras_{len(store)}"):
+                        moved = click_next_and_wait()
+                if not moved:
+                    break
+        finally:
+            if profiler is not None:
+                profiler.close()
 
     # Limpiar + deduplicar
-    for c in cols:
-        df[c] = df[c].astype(str).map(clean)
-
-    df = df.drop_duplicates(subset=["Codice_univoco", "Partita_IVA", "Indirizzo"], keep="first")
-    return df
+    return rows_to_dataframe(store)
 
 
 if __name__ == "__main__":
-    df = scrape_roma()
-    print(f"Filas extraídas: {len(df)}")
-    df.to_csv("farmacie_roma.csv", index=False, encoding="utf-8-sig")
-    print("Guardado: farmacie_roma.csv")
+    from farmacias.export import Exporter
+
+    with Exporter() as exporter:
+        df = scrape_roma()
+        print(f"Filas extraídas: {len(df)}")
+        exporter.submit(df, "farmacie_roma.csv")